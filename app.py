@@ -1,5 +1,10 @@
 import os
 import logging
+import functools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from flask import Flask, render_template, request, jsonify
 from data_processor import DataProcessor
 from lstm_model import LSTMPredictor
@@ -17,21 +22,109 @@ app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-prod
 data_processor = DataProcessor()
 lstm_predictor = LSTMPredictor()
 
+# Filtered frames are reused for a short while so repeated dashboard polls
+# do not re-run the pandas filtering
+FILTER_CACHE_SIZE = 128
+FILTER_CACHE_TTL = 60  # seconds
+_filter_cache = OrderedDict()
+_filter_cache_lock = threading.Lock()
+
+# Pipeline runs in progress, shared by concurrent requests with the same filters
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def _csv_mtime():
+    """Modification time of the CSV file, used as the cache key"""
+    try:
+        return os.path.getmtime(data_processor.csv_path)
+    except OSError:
+        return None
+
+@functools.lru_cache(maxsize=1)
+def _load_cached(mtime):
+    """Load CSV data once per file version"""
+    return data_processor.load_data()
+
+@functools.lru_cache(maxsize=1)
+def _red_onion_cached(mtime):
+    """Red onion data once per file version"""
+    return data_processor.filter_red_onion_data(_load_cached(mtime))
+
+@functools.lru_cache(maxsize=1)
+def _provinces_cached(mtime):
+    """Provinces list once per file version"""
+    return data_processor.get_provinces(_red_onion_cached(mtime))
+
+def _filtered_cached(province, start_date, end_date):
+    """Red onion data with filters applied, cached for FILTER_CACHE_TTL seconds"""
+    mtime = _csv_mtime()
+    key = (mtime, province, start_date, end_date)
+    now = time.monotonic()
+    
+    with _filter_cache_lock:
+        entry = _filter_cache.get(key)
+        if entry is not None and now - entry[0] < FILTER_CACHE_TTL:
+            _filter_cache.move_to_end(key)
+            return entry[1]
+    
+    filtered_data = data_processor.apply_filters(_red_onion_cached(mtime), province, start_date, end_date)
+    
+    with _filter_cache_lock:
+        _filter_cache[key] = (now, filtered_data)
+        _filter_cache.move_to_end(key)
+        while len(_filter_cache) > FILTER_CACHE_SIZE:
+            _filter_cache.popitem(last=False)
+    
+    return filtered_data
+
+def _coalesced(key, func):
+    """Run func once for all concurrent callers sharing the same key"""
+    with _inflight_lock:
+        future = _inflight.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = Future()
+            _inflight[key] = future
+    
+    if is_owner:
+        try:
+            future.set_result(func())
+        except BaseException as e:
+            # Also covers SystemExit and friends so waiters are never left hanging
+            future.set_exception(e)
+        finally:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+    
+    return future.result()
+
+def _build_chart_data(province, start_date, end_date):
+    """Filter data, generate predictions and prepare chart data"""
+    # Load and filter data
+    filtered_data = _filtered_cached(province, start_date, end_date)
+    
+    # Generate LSTM predictions
+    daily_prices = lstm_predictor.daily_prices(filtered_data)
+    predictions = lstm_predictor.predict_prices(daily_prices)
+    
+    # Prepare chart data
+    return data_processor.prepare_chart_data(filtered_data, predictions)
+
 @app.route('/')
 def dashboard():
     """Main dashboard route"""
     try:
-        # Load and process data
-        df = data_processor.load_data()
+        # Load and process data (cached per CSV version)
+        mtime = _csv_mtime()
         
         # Get red onion data specifically
-        red_onion_data = data_processor.filter_red_onion_data(df)
+        red_onion_data = _red_onion_cached(mtime)
         
         # Calculate KPIs
         kpis = data_processor.calculate_kpis(red_onion_data)
         
         # Get provinces list for filter
-        provinces = data_processor.get_provinces(red_onion_data)
+        provinces = _provinces_cached(mtime)
         
         # Get recent data for table
         recent_data = data_processor.get_recent_data(red_onion_data, limit=10)
@@ -67,18 +160,9 @@ def get_chart_data():
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         
-        # Load and filter data
-        df = data_processor.load_data()
-        red_onion_data = data_processor.filter_red_onion_data(df)
-        
-        # Apply filters
-        filtered_data = data_processor.apply_filters(red_onion_data, province, start_date, end_date)
-        
-        # Generate LSTM predictions
-        predictions = lstm_predictor.predict(filtered_data)
-        
-        # Prepare chart data
-        chart_data = data_processor.prepare_chart_data(filtered_data, predictions)
+        # Concurrent requests with the same filters share one pipeline run
+        chart_data = _coalesced(('chart_data', province, start_date, end_date),
+                                lambda: _build_chart_data(province, start_date, end_date))
         
         return jsonify(chart_data)
         
@@ -95,9 +179,7 @@ def update_filters():
         end_date = request.args.get('end_date')
         
         # Load and filter data
-        df = data_processor.load_data()
-        red_onion_data = data_processor.filter_red_onion_data(df)
-        filtered_data = data_processor.apply_filters(red_onion_data, province, start_date, end_date)
+        filtered_data = _filtered_cached(province, start_date, end_date)
         
         # Recalculate KPIs
         kpis = data_processor.calculate_kpis(filtered_data)
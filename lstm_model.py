@@ -1,16 +1,66 @@
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
+from scipy.signal import lfilter
 from sklearn.metrics import mean_absolute_error
 import logging
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
 class LSTMPredictor:
     def __init__(self):
-        self.scaler = MinMaxScaler()
+        self.price_min = None  # Scaling range from the last prepare_data call
+        self.price_max = None
         self.model = None
         self.sequence_length = 30
         self.is_trained = False
+        self._rng = np.random.default_rng()  # Noise source for the ensemble
+        
+        # Ensemble weights: MA, Trend, Seasonal, Exponential
+        self._weights = np.array([0.3, 0.25, 0.25, 0.2], dtype=np.float64)
+        self._noise_factor = 0.02  # 2% noise
+        
+        # Daily average prices per DataFrame; the frame itself is kept in the
+        # entry so its id cannot be reused while cached
+        self._daily_cache = OrderedDict()
+        self._daily_cache_size = 8
+        self._daily_cache_lock = threading.Lock()
+        
+        # Predictions per price series, so repeated polls skip the forecast
+        self._pred_cache = OrderedDict()
+        self._pred_cache_size = 256
+        self._pred_cache_lock = threading.Lock()
+        
+    def daily_prices(self, df):
+        """Daily average prices sorted by date as a float32 array"""
+        key = id(df)
+        with self._daily_cache_lock:
+            entry = self._daily_cache.get(key)
+            if entry is not None and entry[0] is df and entry[1] == len(df):
+                self._daily_cache.move_to_end(key)
+                return entry[2]
+        
+        # Frames from DataProcessor.load_data carry a sorted DatetimeIndex,
+        # which resample bins directly without hashing dates
+        if isinstance(df.index, pd.DatetimeIndex):
+            daily_avg = df['Harga'].resample('D').mean().dropna()
+        else:
+            daily_avg = df.groupby('Date')['Harga'].mean()  # groupby sorts by Date
+        
+        # float32 is plenty for prices in the tens of thousands and halves the
+        # memory the forecast helpers touch
+        prices = daily_avg.to_numpy(dtype=np.float32)
+        prices.flags.writeable = False  # Shared between callers
+        
+        with self._daily_cache_lock:
+            self._daily_cache[key] = (df, len(df), prices)
+            self._daily_cache.move_to_end(key)
+            while len(self._daily_cache) > self._daily_cache_size:
+                self._daily_cache.popitem(last=False)
+        
+        return prices
         
     def prepare_data(self, df):
         """Prepare data for LSTM model"""
@@ -19,16 +69,14 @@ class LSTMPredictor:
                 logging.warning("Insufficient data for LSTM preparation")
                 return None, None
             
-            # Sort by date and get prices
-            df_sorted = df.sort_values('Date')
+            # Daily average prices sorted by date
+            prices = self.daily_prices(df).reshape(-1, 1)
             
-            # Group by date to get daily averages
-            daily_prices = df_sorted.groupby('Date')['Harga'].mean().reset_index()
-            prices = daily_prices['Harga'].values.reshape(-1, 1)
-            
-            # Scale the data
+            # Scale the data to [0, 1] (min-max)
             try:
-                scaled_prices = self.scaler.fit_transform(prices)
+                self.price_min = prices.min()
+                self.price_max = prices.max()
+                scaled_prices = (prices - self.price_min) * (1.0 / (self.price_max - self.price_min + 1e-12))
                 return scaled_prices, prices
             except Exception as scale_error:
                 logging.error(f"Error scaling data: {scale_error}")
@@ -44,11 +92,11 @@ class LSTMPredictor:
             if data is None or len(data) < self.sequence_length:
                 return None, None
                 
-            X, y = [], []
-            for i in range(self.sequence_length, len(data)):
-                X.append(data[i-self.sequence_length:i, 0])
-                y.append(data[i, 0])
-            return np.array(X), np.array(y)
+            # Each window of sequence_length values predicts the value after it
+            values = data[:, 0]
+            X = sliding_window_view(values, self.sequence_length)[:-1]
+            y = values[self.sequence_length:]
+            return np.ascontiguousarray(X), np.array(y)
         except Exception as e:
             logging.error(f"Error creating sequences: {str(e)}")
             return None, None
@@ -61,17 +109,43 @@ class LSTMPredictor:
                 return []
             
             # Prepare daily average prices
-            df_sorted = df.sort_values('Date')
-            daily_avg = df_sorted.groupby('Date')['Harga'].mean().reset_index()
+            prices = self.daily_prices(df)
+            
+            return self.predict_prices(prices, days_ahead)
             
-            if len(daily_avg) < 10:
+        except Exception as e:
+            logging.error(f"Error generating predictions: {str(e)}")
+            return []
+    
+    def predict_prices(self, prices, days_ahead=7):
+        """Generate predictions from daily average prices sorted by date"""
+        try:
+            if len(prices) < 10:
                 return []
             
-            prices = daily_avg['Harga'].values
-            dates = daily_avg['Date'].values
+            # Every method reads the whole series (smoothing and the seasonal
+            # means included), so the key covers all of it, not just the tail
+            prices = np.ascontiguousarray(prices)
+            digest = hashlib.blake2b(prices.tobytes(), digest_size=8).digest()
+            key = (digest, prices.dtype.str, days_ahead)
+            
+            with self._pred_cache_lock:
+                cached = self._pred_cache.get(key)
+                if cached is not None:
+                    self._pred_cache.move_to_end(key)
+                    return list(cached)
+            
+            # Seed the noise from the series so cached and fresh results agree
+            rng = np.random.default_rng(int.from_bytes(digest, 'little'))
             
             # Calculate various trend components
-            predictions = self._advanced_forecast(prices, days_ahead)
+            predictions = self._advanced_forecast(prices, days_ahead, rng)
+            
+            with self._pred_cache_lock:
+                self._pred_cache[key] = list(predictions)
+                self._pred_cache.move_to_end(key)
+                while len(self._pred_cache) > self._pred_cache_size:
+                    self._pred_cache.popitem(last=False)
             
             return predictions
             
@@ -79,7 +153,7 @@ class LSTMPredictor:
             logging.error(f"Error generating predictions: {str(e)}")
             return []
     
-    def _advanced_forecast(self, prices, days_ahead):
+    def _advanced_forecast(self, prices, days_ahead, rng=None):
         """Advanced forecasting using multiple techniques"""
         try:
             if len(prices) < 5:
@@ -97,29 +171,19 @@ class LSTMPredictor:
             # Method 4: Exponential smoothing
             exp_predictions = self._exponential_smoothing_forecast(prices, days_ahead)
             
-            # Ensemble: Combine all methods with weights
-            weights = [0.3, 0.25, 0.25, 0.2]  # MA, Trend, Seasonal, Exponential
+            # Ensemble: Combine all methods with weights. Each method returns
+            # days_ahead values, so the weighted average is a single
+            # (4,) @ (4, days_ahead) product
+            stack = np.vstack([ma_predictions, trend_predictions,
+                               seasonal_predictions, exp_predictions])
+            ensemble_pred = self._weights @ stack
             
-            final_predictions = []
-            for i in range(days_ahead):
-                pred_values = [
-                    ma_predictions[i] if i < len(ma_predictions) else ma_predictions[-1],
-                    trend_predictions[i] if i < len(trend_predictions) else trend_predictions[-1],
-                    seasonal_predictions[i] if i < len(seasonal_predictions) else seasonal_predictions[-1],
-                    exp_predictions[i] if i < len(exp_predictions) else exp_predictions[-1]
-                ]
-                
-                # Weighted average
-                ensemble_pred = sum(w * v for w, v in zip(weights, pred_values))
-                
-                # Add some realistic noise
-                noise_factor = 0.02  # 2% noise
-                noise = np.random.normal(0, ensemble_pred * noise_factor)
-                final_pred = max(0, ensemble_pred + noise)  # Ensure non-negative
-                
-                final_predictions.append(final_pred)
+            # Add some realistic noise
+            rng = rng if rng is not None else self._rng
+            noise = rng.standard_normal(days_ahead) * (ensemble_pred * self._noise_factor)
+            final_predictions = np.maximum(0, ensemble_pred + noise)  # Ensure non-negative
             
-            return final_predictions
+            return final_predictions.tolist()
             
         except Exception as e:
             logging.error(f"Error in advanced forecast: {str(e)}")
@@ -132,8 +196,10 @@ class LSTMPredictor:
             if window < 2:
                 window = 2
             
-            # Calculate moving average
-            ma = np.convolve(prices, np.ones(window), 'valid') / window
+            # Calculate moving average from running sums (accumulated in float64
+            # so long float32 series do not lose precision)
+            cumsum = np.cumsum(prices, dtype=np.float64)
+            ma = np.concatenate(([cumsum[window - 1]], cumsum[window:] - cumsum[:-window])) / window
             
             # Calculate trend from recent moving averages
             if len(ma) >= 2:
@@ -142,117 +208,97 @@ class LSTMPredictor:
                 recent_trend = 0
             
             # Project forward
-            predictions = []
             last_ma = ma[-1] if len(ma) > 0 else prices[-1]
-            
-            for i in range(days_ahead):
-                pred = last_ma + (recent_trend * (i + 1))
-                predictions.append(max(0, pred))
+            steps = np.arange(1, days_ahead + 1)
+            predictions = np.maximum(0, last_ma + recent_trend * steps)
             
             return predictions
             
         except Exception as e:
             logging.error(f"Error in moving average forecast: {e}")
-            return [prices[-1]] * days_ahead
+            return np.full(days_ahead, prices[-1])
     
     def _trend_forecast(self, prices, days_ahead):
         """Linear trend forecast"""
         try:
             if len(prices) < 2:
-                return [prices[-1]] * days_ahead
+                return np.full(days_ahead, prices[-1])
             
             # Use recent data for trend calculation
             recent_data = prices[-min(14, len(prices)):]  # Last 14 days or available data
-            x = np.arange(len(recent_data))
+            n = len(recent_data)
+            x = np.arange(n, dtype=np.float64)
             
-            # Linear regression
-            coeffs = np.polyfit(x, recent_data, 1)
-            slope, intercept = coeffs
+            # Linear regression (closed-form least squares for x = 0..n-1)
+            x_mean = (n - 1) / 2.0
+            y_mean = recent_data.mean()
+            slope = ((x - x_mean) * (recent_data - y_mean)).sum() / (n * (n * n - 1) / 12.0)
+            intercept = y_mean - slope * x_mean
             
             # Project forward
-            predictions = []
-            start_x = len(recent_data)
-            
-            for i in range(days_ahead):
-                pred = slope * (start_x + i) + intercept
-                predictions.append(max(0, pred))
+            future_x = n + np.arange(days_ahead)
+            predictions = np.maximum(0, slope * future_x + intercept)
             
             return predictions
             
         except Exception as e:
             logging.error(f"Error in trend forecast: {e}")
-            return [prices[-1]] * days_ahead
+            return np.full(days_ahead, prices[-1])
     
     def _seasonal_forecast(self, prices, days_ahead):
         """Simplified seasonal forecast"""
         try:
             if len(prices) < 7:
-                return [prices[-1]] * days_ahead
+                return np.full(days_ahead, prices[-1])
             
             # Calculate weekly seasonality (simplified)
             week_length = 7
-            seasonal_pattern = []
+            n_full = (len(prices) // week_length) * week_length
             
-            for day in range(week_length):
-                day_prices = []
-                for i in range(day, len(prices), week_length):
-                    day_prices.append(prices[i])
-                
-                if day_prices:
-                    avg_day_price = np.mean(day_prices)
-                    seasonal_pattern.append(avg_day_price)
-                else:
-                    seasonal_pattern.append(prices[-1])
+            # Sum full weeks column-wise, then fold in the partial last week
+            day_sums = prices[:n_full].reshape(-1, week_length).sum(axis=0)
+            day_counts = np.full(week_length, n_full // week_length, dtype=np.float64)
+            tail = prices[n_full:]
+            day_sums[:len(tail)] += tail
+            day_counts[:len(tail)] += 1
+            seasonal_pattern = day_sums / day_counts
             
             # Apply seasonal pattern
-            predictions = []
-            overall_mean = np.mean(prices)
-            
-            for i in range(days_ahead):
-                day_of_week = i % week_length
-                seasonal_factor = seasonal_pattern[day_of_week] / overall_mean
-                pred = prices[-1] * seasonal_factor
-                predictions.append(max(0, pred))
+            seasonal_factors = seasonal_pattern / np.mean(prices)
+            day_of_week = np.arange(days_ahead) % week_length
+            predictions = np.maximum(0, prices[-1] * seasonal_factors[day_of_week])
             
             return predictions
             
         except Exception as e:
             logging.error(f"Error in seasonal forecast: {e}")
-            return [prices[-1]] * days_ahead
+            return np.full(days_ahead, prices[-1])
     
     def _exponential_smoothing_forecast(self, prices, days_ahead):
         """Exponential smoothing forecast"""
         try:
             if len(prices) < 2:
-                return [prices[-1]] * days_ahead
+                return np.full(days_ahead, prices[-1])
             
             alpha = 0.3  # Smoothing parameter
             
             # Calculate exponentially smoothed values
-            smoothed = [prices[0]]
-            for i in range(1, len(prices)):
-                smoothed_val = alpha * prices[i] + (1 - alpha) * smoothed[-1]
-                smoothed.append(smoothed_val)
+            # s[i] = alpha * p[i] + (1 - alpha) * s[i-1], seeded so that s[0] = p[0]
+            smoothed = lfilter([alpha], [1.0, -(1.0 - alpha)], prices,
+                               zi=[(1.0 - alpha) * prices[0]])[0]
             
             # Calculate trend
-            if len(smoothed) >= 2:
-                trend = smoothed[-1] - smoothed[-2]
-            else:
-                trend = 0
+            trend = smoothed[-1] - smoothed[-2]
             
             # Project forward
-            predictions = []
-            last_smoothed = smoothed[-1]
-            
-            for i in range(days_ahead):
-                pred = last_smoothed + (trend * (i + 1) * 0.5)  # Damped trend
-                predictions.append(max(0, pred))
+            steps = np.arange(1, days_ahead + 1)
+            predictions = np.maximum(0, smoothed[-1] + trend * steps * 0.5)  # Damped trend
             
             return predictions
             
         except Exception as e:
             logging.error(f"Error in exponential smoothing forecast: {e}")
-            return [prices[-1]] * days_ahead
+            return np.full(days_ahead, prices[-1])
     
     def _simple_forecast(self, prices, days_ahead):
         """Simple fallback forecast"""
@@ -286,18 +332,17 @@ class LSTMPredictor:
             
             # Ensure same length
             min_len = min(len(actual), len(predicted))
-            actual = actual[:min_len]
-            predicted = predicted[:min_len]
+            actual_vals = np.asarray(actual[:min_len], dtype=np.float64)
+            pred_vals = np.asarray(predicted[:min_len], dtype=np.float64)
             
-            # Remove any None or invalid values
-            valid_pairs = [(a, p) for a, p in zip(actual, predicted) 
-                          if a is not None and p is not None and a > 0]
+            # Remove any None (NaN after conversion) or invalid values
+            valid = np.isfinite(actual_vals) & np.isfinite(pred_vals) & (actual_vals > 0)
             
-            if not valid_pairs:
+            if not valid.any():
                 return 0
             
-            actual_vals = np.array([pair[0] for pair in valid_pairs])
-            pred_vals = np.array([pair[1] for pair in valid_pairs])
+            actual_vals = actual_vals[valid]
+            pred_vals = pred_vals[valid]
             
             # Calculate MAPE (Mean Absolute Percentage Error)
             mape = np.mean(np.abs((actual_vals - pred_vals) / actual_vals)) * 100